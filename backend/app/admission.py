@@ -0,0 +1,117 @@
+"""
+Admission control and load shedding
+
+Each pipeline stage (embedding, search, LLM) has its own concurrency limit
+and a bounded wait queue, so a traffic spike fails fast instead of raising
+latency for every request.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when a stage cannot admit a request before its deadline"""
+
+    def __init__(self, stage: str, retry_after: int):
+        super().__init__(f"Service overloaded at stage '{stage}'")
+        self.stage = stage
+        self.retry_after = retry_after
+
+
+class StageLimiter:
+    """Concurrency limit with a bounded, deadline-aware wait queue"""
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def _reject(self):
+        self.rejected += 1
+        logger.warning(f"Shedding request at stage '{self.name}'")
+        raise Overloaded(self.name, settings.ADMISSION_RETRY_AFTER_SECONDS)
+
+    async def acquire(self, deadline: float):
+        """
+        Acquire a slot, waiting at most until deadline (event loop time)
+
+        Raises:
+            Overloaded: If the wait queue is full or the deadline passes
+        """
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self._reject()
+
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                self._reject()
+
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=timeout)
+            except asyncio.TimeoutError:
+                self._reject()
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self, deadline: float):
+        """Hold a slot for the duration of the block"""
+        await self.acquire(deadline)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def get_status(self) -> dict:
+        return {
+            "active": self.active,
+            "limit": self.limit,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionController:
+    """Stage limiters for the RAG pipeline"""
+
+    def __init__(self):
+        self.embedding = StageLimiter(
+            "embedding", settings.EMBEDDING_CONCURRENCY, settings.ADMISSION_QUEUE_SIZE
+        )
+        self.search = StageLimiter(
+            "search", settings.SEARCH_CONCURRENCY, settings.ADMISSION_QUEUE_SIZE
+        )
+        self.llm = StageLimiter(
+            "llm", settings.LLM_CONCURRENCY, settings.ADMISSION_QUEUE_SIZE
+        )
+
+    def deadline(self) -> float:
+        """Get the admission deadline for a request starting now"""
+        return asyncio.get_running_loop().time() + settings.ADMISSION_TIMEOUT_SECONDS
+
+    def get_status(self) -> dict:
+        return {
+            "timeout_seconds": settings.ADMISSION_TIMEOUT_SECONDS,
+            "stages": {
+                limiter.name: limiter.get_status()
+                for limiter in (self.embedding, self.search, self.llm)
+            },
+        }
@@ -1,11 +1,24 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from groq import RateLimitError
 
+from app.admission import AdmissionController, Overloaded
 from app.config import settings
-from app.dependencies import FAISSIndexManager, get_faiss_manager
+from app.dependencies import (
+    IndexRegistry,
+    get_admission_controller,
+    get_index_registry,
+    get_session_store,
+)
 from .schemas import ChatRequest
-from .services import stream_groq_response
+from .services import (
+    ManagedStreamingResponse,
+    build_messages,
+    create_groq_stream,
+    retry_after_seconds,
+    stream_groq_response,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -13,23 +26,101 @@ router = APIRouter()
 
 @router.post("/ask-stream")
 async def ask_stream(
-    request: ChatRequest, faiss_manager: FAISSIndexManager = Depends(get_faiss_manager)
+    request: ChatRequest,
+    index_registry: IndexRegistry = Depends(get_index_registry),
+    session_store=Depends(get_session_store),
+    admission: AdmissionController = Depends(get_admission_controller),
 ):
     """
     RAG endpoint with streaming response
 
-    Retrieves relevant document chunks and streams LLM response
+    Retrieves relevant document chunks from the requested collection
+    (loaded on first use) and streams LLM response
+
+    When request.session_id is set, history is read from and appended to
+    the server-side session store instead of being sent by the client. If the
+    server has no record of the session, it responds 409 and the client
+    resends its local history to seed it
+
+    Each stage (embedding, search, LLM) is admission controlled; when the
+    service is saturated the request fails fast with 503 and Retry-After
 
     Args:
         request: Chat request with question
-        faiss_manager: FAISS index manager dependency
+        index_registry: FAISS collection registry dependency
+        session_store: Conversation session store dependency
+        admission: Admission controller dependency
 
     Returns:
         StreamingResponse with text/plain content
     """
     try:
-        # Check if FAISS index is loaded
-        if not faiss_manager.is_loaded:
+        deadline = admission.deadline()
+
+        # Convert history to dict format
+        history = (
+            [msg.model_dump() for msg in request.history] if request.history else []
+        )
+        history_text = None
+        on_complete = None
+        headers = {
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        }
+
+        if request.session_id:
+            session_id = request.session_id
+            session = await session_store.get(session_id)
+            seed_history = []
+
+            if session is None:
+                # Unknown session (new, expired, evicted or held by another
+                # instance): the client must send its local history, even if
+                # empty, to start or restore it
+                if request.history is None:
+                    raise HTTPException(
+                        status_code=409,
+                        detail="Session not found. Resend the request with history to restore it.",
+                        headers={"X-Session-ID": session_id},
+                    )
+                # Only stored once the answer completes, so rejected or
+                # failed requests leave no session state behind
+                seed_history = history
+            else:
+                history = list(session.messages)
+                history_text = session.summary
+
+            async def on_complete(answer: str):
+                await session_store.append(
+                    session_id,
+                    seed_history
+                    + [
+                        {"role": "user", "content": request.question},
+                        {"role": "assistant", "content": answer},
+                    ],
+                )
+
+            headers["X-Session-ID"] = session_id
+
+        # Get the collection's FAISS index, loading it if needed
+        collection = request.collection or settings.DEFAULT_COLLECTION
+        try:
+            faiss_manager = await index_registry.get(collection, deadline)
+        except Overloaded:
+            raise
+        except FileNotFoundError as e:
+            # A missing default index is a server problem, not a bad request
+            if collection == settings.DEFAULT_COLLECTION:
+                logger.error(f"Failed to load default collection: {e}")
+                raise HTTPException(
+                    status_code=503,
+                    detail="FAISS index not loaded. Please check server logs.",
+                )
+            raise HTTPException(
+                status_code=404, detail=f"Collection not found: {collection}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to load collection {collection}: {e}")
             raise HTTPException(
                 status_code=503,
                 detail="FAISS index not loaded. Please check server logs.",
@@ -37,10 +128,16 @@ async def ask_stream(
 
         logger.info(f"Processing question: {request.question[:100]}...")
 
-        # Search for relevant chunks
-        context_chunks = faiss_manager.search(
-            query=request.question, k=settings.K_NEIGHBORS
-        )
+        # Vectorize question and search for relevant chunks
+        async with admission.embedding.slot(deadline):
+            query_vector = await run_in_threadpool(
+                faiss_manager.vectorize_query, request.question
+            )
+
+        async with admission.search.slot(deadline):
+            context_chunks = await run_in_threadpool(
+                faiss_manager.search_vector, query_vector, settings.K_NEIGHBORS
+            )
 
         logger.info(f"Retrieved {len(context_chunks)} context chunks")
 
@@ -51,29 +148,50 @@ async def ask_stream(
             else settings.GROQ_TEMPERATURE
         )
 
-        # Convert history to dict format
-        history = (
-            [msg.model_dump() for msg in request.history] if request.history else []
+        messages = build_messages(
+            request.question, context_chunks, history, history_text
         )
 
-        # Return streaming response with SSE media type
-        return StreamingResponse(
-            stream_groq_response(
-                request.question,
-                context_chunks,
-                settings.GROQ_MODEL,
-                temperature,
-                history,
-            ),
+        # Open the Groq stream before responding so rate limits surface as 503
+        await admission.llm.acquire(deadline)
+        try:
+            stream = await create_groq_stream(
+                messages, settings.GROQ_MODEL, temperature, deadline
+            )
+        except BaseException:
+            admission.llm.release()
+            raise
+
+        async def release_llm():
+            admission.llm.release()
+            await stream.close()
+
+        # Return streaming response with SSE media type; the LLM slot is
+        # released and the Groq stream closed once sending ends, even if
+        # the body was never started
+        return ManagedStreamingResponse(
+            stream_groq_response(stream, on_complete),
+            cleanup=release_llm,
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-            },
+            headers=headers,
         )
 
     except HTTPException:
         raise
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Service overloaded, please retry later.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except RateLimitError as e:
+        logger.error(f"Groq rate limit persisted after retries: {e}")
+        retry_after = retry_after_seconds(e) or settings.ADMISSION_RETRY_AFTER_SECONDS
+        raise HTTPException(
+            status_code=503,
+            detail="LLM provider rate limited, please retry later.",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
     except Exception as e:
         logger.error(f"Error in ask_stream endpoint: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 
+from app.config import COLLECTION_NAME_PATTERN
+
 
 class Message(BaseModel):
     """Single message in conversation history"""
@@ -14,7 +16,19 @@ class ChatRequest(BaseModel):
 
     question: str = Field(..., min_length=1, description="User question")
     history: Optional[List[Message]] = Field(
-        default=[], description="Conversation history"
+        default=None,
+        description="Conversation history (with session_id, only sent to start or restore a session)",
+    )
+    session_id: Optional[str] = Field(
+        None,
+        min_length=1,
+        max_length=128,
+        description="Server-side session ID; when set, history is kept by the server",
+    )
+    collection: Optional[str] = Field(
+        None,
+        pattern=COLLECTION_NAME_PATTERN,
+        description="Document collection to search (defaults to the default collection)",
     )
     temperature: Optional[float] = Field(
         None, ge=0.0, le=2.0, description="Temperature for LLM response generation"
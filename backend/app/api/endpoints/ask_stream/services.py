@@ -1,15 +1,38 @@
+import asyncio
+import json
 import logging
-from groq import Groq
+import random
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from fastapi.responses import StreamingResponse
+from groq import AsyncGroq, RateLimitError
 from app.config import settings
+from app.sessions import format_history
 
 logger = logging.getLogger(__name__)
 
+
+class RateLimitAwareGroq(AsyncGroq):
+    """
+    Groq client that leaves rate limits (429) to create_groq_stream
+
+    The SDK keeps retrying connection errors, 408, 409 and 5xx itself.
+    """
+
+    def _should_retry(self, response) -> bool:
+        if response.status_code == 429:
+            return False
+        return super()._should_retry(response)
+
+
 # Initialize Groq client
-groq_client = Groq(api_key=settings.GROQ_API_KEY)
+groq_client = RateLimitAwareGroq(api_key=settings.GROQ_API_KEY)
 
 
 def build_prompt(
-    question: str, context_chunks: list[dict], history: list[dict] = None
+    question: str,
+    context_chunks: list[dict],
+    history: list[dict] = None,
+    history_text: Optional[str] = None,
 ) -> str:
     """
     Build prompt with retrieved context chunks and conversation history
@@ -17,6 +40,7 @@ def build_prompt(
         question: User question
         context_chunks: List of relevant document chunks
         history: Conversation history (list of messages)
+        history_text: Pre-rendered history (e.g. a cached session summary)
     Returns:
         Formatted prompt string
     """
@@ -31,15 +55,9 @@ def build_prompt(
         )
     context = "\n\n".join(context_parts)
 
-    # Build history string
-    history_text = ""
-    if history:
-        history_parts = []
-        for msg in history:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            history_parts.append(f"{role.capitalize()}: {content}")
-        history_text = "\n".join(history_parts)
+    # Build history string unless a cached one was provided
+    if history_text is None:
+        history_text = format_history(history) if history else ""
 
     logger.info(f"History: {history_text}")
 
@@ -67,70 +85,155 @@ Answer:"""
     return prompt
 
 
-async def stream_groq_response(
+def build_messages(
     question: str,
     context_chunks: list[dict],
-    model: str,
-    temperature: float,
     history: list[dict] = None,
-):
+    history_text: Optional[str] = None,
+) -> list[dict]:
     """
-    Generator function that streams response from Groq API in SSE format
+    Build the Groq messages array from history and the context prompt
     Args:
         question: User question
         context_chunks: Retrieved context chunks
-        model: Groq model to use
-        temperature: Temperature for response generation
         history: Conversation history (list of messages)
-    Yields:
-        Server-Sent Events formatted chunks
+        history_text: Pre-rendered history (e.g. a cached session summary)
+    Returns:
+        List of chat messages
     """
-    try:
-        # Build prompt with context
-        prompt = build_prompt(question, context_chunks, history)
+    # Build prompt with context
+    prompt = build_prompt(question, context_chunks, history, history_text)
 
-        logger.info(f"Calling Groq API with model: {model}")
+    # Build messages array with history
+    messages = []
 
-        # Build messages array with history
-        messages = []
+    # Add conversation history if provided
+    if history:
+        for msg in history:
+            messages.append({"role": msg.get("role"), "content": msg.get("content")})
 
-        # Add conversation history if provided
-        if history:
-            for msg in history:
-                messages.append(
-                    {"role": msg.get("role"), "content": msg.get("content")}
-                )
+    # Add current question with context
+    messages.append({"role": "user", "content": prompt})
 
-        # Add current question with context
-        messages.append({"role": "user", "content": prompt})
+    logger.info(f"Messages count: {len(messages)}")
 
-        logger.info(f"Messages count: {len(messages)}")
+    return messages
 
-        # Call Groq API with streaming
-        stream = groq_client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=settings.GROQ_MAX_TOKENS,
-            stream=True,
-        )
 
-        # Stream response chunks in SSE format
-        import json
+def retry_after_seconds(error: RateLimitError) -> Optional[float]:
+    """Get the Retry-After delay of a Groq rate limit error, if any"""
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
 
-        for chunk in stream:
+async def create_groq_stream(
+    messages: list[dict], model: str, temperature: float, deadline: float
+):
+    """
+    Open a streaming Groq completion, retrying rate limits with backoff
+    Args:
+        messages: Chat messages
+        model: Groq model to use
+        temperature: Temperature for response generation
+        deadline: Event loop time after which no retry is attempted
+    Returns:
+        Groq async stream of completion chunks
+    Raises:
+        RateLimitError: If still rate limited and another retry is not worth it
+            (retries exhausted, Retry-After too long or past the deadline)
+    """
+    logger.info(f"Calling Groq API with model: {model}")
+    loop = asyncio.get_running_loop()
+
+    for attempt in range(settings.GROQ_MAX_RETRIES + 1):
+        try:
+            return await groq_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=settings.GROQ_MAX_TOKENS,
+                stream=True,
+            )
+        except RateLimitError as e:
+            if attempt == settings.GROQ_MAX_RETRIES:
+                raise
+
+            # Waiting longer than we allow would only burn quota; the caller
+            # passes Groq's Retry-After on to the client instead
+            retry_after = retry_after_seconds(e)
+            if retry_after is not None and retry_after > settings.GROQ_RETRY_MAX_SECONDS:
+                raise
+
+            # Exponential backoff with full jitter, on top of Groq's
+            # Retry-After when given so waiting requests don't retry together
+            backoff = min(
+                settings.GROQ_RETRY_MAX_SECONDS,
+                settings.GROQ_RETRY_BASE_SECONDS * 2**attempt,
+            )
+            delay = (retry_after or 0) + random.uniform(0, backoff)
+
+            if loop.time() + delay > deadline:
+                raise
+
+            logger.warning(
+                f"Groq rate limited, retrying in {delay:.2f}s "
+                f"(attempt {attempt + 1}/{settings.GROQ_MAX_RETRIES})"
+            )
+            await asyncio.sleep(delay)
+
+
+async def stream_groq_response(
+    stream: AsyncIterator,
+    on_complete: Optional[Callable[[str], Awaitable[None]]] = None,
+):
+    """
+    Generator function that streams response from Groq API in SSE format
+    Args:
+        stream: Groq stream opened with create_groq_stream (closed by the
+            response's cleanup, not here)
+        on_complete: Called with the full answer once streaming succeeds
+    Yields:
+        Server-Sent Events formatted chunks
+    """
+    try:
+        # Stream response chunks in SSE format
+        answer_parts = []
+        async for chunk in stream:
             if chunk.choices[0].delta.content:
                 content = chunk.choices[0].delta.content
+                answer_parts.append(content)
                 # Format as Server-Sent Event with JSON payload
                 event_data = json.dumps({"content": content})
                 yield f"data: {event_data}\n\n"
 
+        if on_complete:
+            await on_complete("".join(answer_parts))
+
         # Send completion event
         yield "data: [DONE]\n\n"
 
     except Exception as e:
         logger.error(f"Error during Groq streaming: {e}")
-        import json
-
         error_data = json.dumps({"error": str(e)})
         yield f"data: {error_data}\n\n"
+
+
+class ManagedStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that runs cleanup once sending ends
+
+    Unlike a finally block in the body generator, cleanup also runs when the
+    body is never iterated (e.g. the client disconnects before the first chunk)
+    """
+
+    def __init__(self, content, cleanup: Callable[[], Awaitable[None]], **kwargs):
+        super().__init__(content, **kwargs)
+        self.cleanup = cleanup
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.cleanup()
@@ -2,23 +2,34 @@
 Health check endpoint
 """
 from fastapi import APIRouter, Depends
-from app.dependencies import FAISSIndexManager, get_faiss_manager
+from app.admission import AdmissionController
+from app.dependencies import (
+    IndexRegistry,
+    get_admission_controller,
+    get_index_registry,
+    get_session_store,
+)
 
 router = APIRouter()
 
 
 @router.get("/health")
 async def health_check(
-    faiss_manager: FAISSIndexManager = Depends(get_faiss_manager)
+    index_registry: IndexRegistry = Depends(get_index_registry),
+    session_store=Depends(get_session_store),
+    admission: AdmissionController = Depends(get_admission_controller),
 ):
     """
     Health check endpoint for AWS App Runner and monitoring
 
-    Returns application status and FAISS index information
+    Returns application status, loaded FAISS collections, session store
+    information and admission queue depths
     """
-    faiss_status = faiss_manager.get_status()
+    faiss_status = index_registry.get_status()
 
     return {
         "status": "ok",
-        "faiss_index": faiss_status
+        "faiss_index": faiss_status,
+        "sessions": session_store.get_status(),
+        "admission": admission.get_status()
     }
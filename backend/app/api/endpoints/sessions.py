@@ -0,0 +1,22 @@
+"""
+Conversation session endpoints
+"""
+from fastapi import APIRouter, Depends, Path, Response
+from app.dependencies import get_session_store
+
+router = APIRouter()
+
+
+@router.delete("/sessions/{session_id}", status_code=204)
+async def delete_session(
+    session_id: str = Path(..., min_length=1, max_length=128),
+    session_store=Depends(get_session_store),
+):
+    """
+    Delete a conversation session
+
+    Called when the client clears its conversation, so the history doesn't
+    linger until LRU eviction or TTL expiry
+    """
+    await session_store.delete(session_id)
+    return Response(status_code=204)
@@ -4,6 +4,10 @@ Application configuration and settings
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
+from typing import Optional
+
+# Allowed collection names (also keeps them safe to use as directory names)
+COLLECTION_NAME_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
 
 
 class Settings(BaseSettings):
@@ -14,6 +18,9 @@ class Settings(BaseSettings):
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
     GROQ_TEMPERATURE: float = 0.7
     GROQ_MAX_TOKENS: int = 1024
+    GROQ_MAX_RETRIES: int = 3  # Retries on Groq rate limits (429)
+    GROQ_RETRY_BASE_SECONDS: float = 0.5
+    GROQ_RETRY_MAX_SECONDS: float = 8.0
 
     # CORS Configuration
     ALLOWED_ORIGINS: str = "http://localhost:3000"
@@ -29,6 +36,30 @@ class Settings(BaseSettings):
     )
     K_NEIGHBORS: int = 5
 
+    # Collection Configuration
+    # DEFAULT_COLLECTION is served from FAISS_INDEX_DIR, other collections
+    # from FAISS_COLLECTIONS_DIR/<name>/
+    DEFAULT_COLLECTION: str = "default"
+    FAISS_COLLECTIONS_DIR: str = "./collections"
+    FAISS_MAX_MEMORY_MB: int = 1024
+
+    # Admission Control Configuration
+    # Concurrent requests allowed per stage; extra requests wait in a bounded
+    # queue until ADMISSION_TIMEOUT_SECONDS, then get 503 with Retry-After
+    EMBEDDING_CONCURRENCY: int = 4
+    SEARCH_CONCURRENCY: int = 8
+    LLM_CONCURRENCY: int = 16
+    ADMISSION_QUEUE_SIZE: int = 32
+    ADMISSION_TIMEOUT_SECONDS: float = 5.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+
+    # Session Configuration
+    SESSION_BACKEND: str = "memory"  # "memory" or "redis"
+    SESSION_MAX_SESSIONS: int = 1000
+    SESSION_MAX_MESSAGES: int = 20
+    SESSION_TTL_SECONDS: int = 3600
+    REDIS_URL: Optional[str] = None
+
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=True
     )
@@ -1,51 +1,104 @@
 """
 Dependencies and shared resources
 """
+import asyncio
 import json
 import logging
+import re
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
 from typing import Optional
 import faiss
 import numpy as np
+from fastapi.concurrency import run_in_threadpool
 from sentence_transformers import SentenceTransformer
-from app.config import settings
+from app.admission import AdmissionController, Overloaded
+from app.config import COLLECTION_NAME_PATTERN, settings
+from app.sessions import create_session_store
 
 logger = logging.getLogger(__name__)
 
 
+def estimate_size(obj) -> int:
+    """Estimate the memory held by a JSON-like object, including containers"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(estimate_size(item) for item in obj)
+    return size
+
+
+def load_embedding_model() -> SentenceTransformer:
+    """Load the sentence-transformers model used to embed queries"""
+    logger.info(f"Loading embedding model: {settings.EMBEDDING_MODEL}")
+    model = SentenceTransformer(settings.EMBEDDING_MODEL)
+    logger.info("Embedding model loaded successfully")
+    return model
+
+
 class FAISSIndexManager:
     """Manages FAISS index and embeddings in memory"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        index_dir: Optional[Path] = None,
+        embedding_model: Optional[SentenceTransformer] = None,
+    ):
+        self.index_dir = Path(index_dir or settings.FAISS_INDEX_DIR)
         self.index: Optional[faiss.Index] = None
         self.chunks: Optional[list[dict]] = None
-        self.embedding_model: Optional[SentenceTransformer] = None
+        self.embedding_model = embedding_model
         self.is_loaded = False
+        self._memory_bytes = 0
+
+    @property
+    def index_path(self) -> Path:
+        return self.index_dir / "index.faiss"
+
+    @property
+    def chunks_path(self) -> Path:
+        return self.index_dir / "index.json"
+
+    @property
+    def memory_bytes(self) -> int:
+        """
+        Estimated memory held by this index
+
+        Serialized FAISS index size plus the size of the chunk objects
+        (dicts, strings and all metadata fields). Computed once at load.
+        """
+        return self._memory_bytes
 
     def load(self):
-        """Load FAISS index, chunks, and embedding model into memory"""
+        """Load FAISS index, chunks, and embedding model (if not shared) into memory"""
         try:
-            logger.info(f"Loading FAISS index from {settings.faiss_index_path}")
+            logger.info(f"Loading FAISS index from {self.index_path}")
 
             # Load FAISS index
-            if not settings.faiss_index_path.exists():
-                raise FileNotFoundError(f"FAISS index not found at {settings.faiss_index_path}")
+            if not self.index_path.exists():
+                raise FileNotFoundError(f"FAISS index not found at {self.index_path}")
 
-            self.index = faiss.read_index(str(settings.faiss_index_path))
+            self.index = faiss.read_index(str(self.index_path))
             logger.info(f"FAISS index loaded successfully with {self.index.ntotal} vectors")
 
             # Load chunks metadata
-            if not settings.faiss_chunks_path.exists():
-                raise FileNotFoundError(f"Chunks file not found at {settings.faiss_chunks_path}")
+            if not self.chunks_path.exists():
+                raise FileNotFoundError(f"Chunks file not found at {self.chunks_path}")
 
-            with open(settings.faiss_chunks_path, "r", encoding="utf-8") as f:
+            with open(self.chunks_path, "r", encoding="utf-8") as f:
                 self.chunks = json.load(f)
             logger.info(f"Loaded {len(self.chunks)} chunks from metadata")
 
-            # Load embedding model
-            logger.info(f"Loading embedding model: {settings.EMBEDDING_MODEL}")
-            self.embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
-            logger.info("Embedding model loaded successfully")
+            # Load embedding model unless one is shared with this manager
+            if self.embedding_model is None:
+                self.embedding_model = load_embedding_model()
 
+            self._memory_bytes = self.index_path.stat().st_size + estimate_size(
+                self.chunks
+            )
             self.is_loaded = True
             logger.info("FAISS index loaded and ready")
 
@@ -80,12 +133,28 @@ class FAISSIndexManager:
         if not self.is_loaded:
             raise RuntimeError("FAISS index not loaded")
 
-        if k is None:
-            k = settings.K_NEIGHBORS
-
         # Vectorize query
         query_vector = self.vectorize_query(query)
 
+        return self.search_vector(query_vector, k)
+
+    def search_vector(self, query_vector: np.ndarray, k: int = None) -> list[dict]:
+        """
+        Search for similar chunks given an already vectorized query
+
+        Args:
+            query_vector: Normalized query embedding
+            k: Number of results to return (defaults to settings.K_NEIGHBORS)
+
+        Returns:
+            List of chunk dictionaries with similarity scores
+        """
+        if not self.is_loaded:
+            raise RuntimeError("FAISS index not loaded")
+
+        if k is None:
+            k = settings.K_NEIGHBORS
+
         # Search FAISS index
         distances, indices = self.index.search(
             query_vector.reshape(1, -1),
@@ -114,15 +183,166 @@ class FAISSIndexManager:
             "loaded": True,
             "num_vectors": self.index.ntotal if self.index else 0,
             "num_chunks": len(self.chunks) if self.chunks else 0,
+            "memory_mb": round(self.memory_bytes / (1024 * 1024), 2),
             "embedding_model": settings.EMBEDDING_MODEL,
             "k_neighbors": settings.K_NEIGHBORS
         }
 
 
+class IndexRegistry:
+    """
+    Maps collection names to FAISS index managers
+
+    Collections are loaded lazily on first use and share a single embedding
+    model. Least recently used collections are evicted once their combined
+    memory exceeds FAISS_MAX_MEMORY_MB.
+
+    Registry state is only touched from the event loop; disk loads run in
+    the threadpool, one per collection, and requests wait for them
+    asynchronously up to their admission deadline.
+    """
+
+    def __init__(self):
+        self.embedding_model: Optional[SentenceTransformer] = None
+        self.max_memory_bytes = settings.FAISS_MAX_MEMORY_MB * 1024 * 1024
+        self._managers: OrderedDict[str, FAISSIndexManager] = OrderedDict()
+        # In-progress loads, shared by concurrent requests for a collection
+        self._loading: dict[str, asyncio.Task] = {}
+        self._model_lock = threading.Lock()
+
+    def load_embedding_model(self) -> SentenceTransformer:
+        """Load the shared embedding model"""
+        with self._model_lock:
+            if self.embedding_model is None:
+                self.embedding_model = load_embedding_model()
+            return self.embedding_model
+
+    def collection_dir(self, collection: str) -> Path:
+        """Get the index directory of a collection"""
+        if collection == settings.DEFAULT_COLLECTION:
+            return Path(settings.FAISS_INDEX_DIR)
+        if not re.match(COLLECTION_NAME_PATTERN, collection):
+            raise ValueError(f"Invalid collection name: {collection}")
+        return Path(settings.FAISS_COLLECTIONS_DIR) / collection
+
+    async def get(
+        self, collection: Optional[str] = None, deadline: Optional[float] = None
+    ) -> FAISSIndexManager:
+        """
+        Get the index manager of a collection, loading it if needed
+
+        Args:
+            collection: Collection name (defaults to settings.DEFAULT_COLLECTION)
+            deadline: Event loop time to stop waiting for a load (None waits)
+
+        Returns:
+            Loaded FAISS index manager
+
+        Raises:
+            ValueError: If the collection name is invalid
+            FileNotFoundError: If the collection has no index on disk
+            Overloaded: If the load does not finish before deadline
+        """
+        collection = collection or settings.DEFAULT_COLLECTION
+        index_dir = self.collection_dir(collection)
+
+        manager = self._managers.get(collection)
+        if manager is not None:
+            self._managers.move_to_end(collection)
+            return manager
+
+        task = self._loading.get(collection)
+        if task is None:
+            task = asyncio.create_task(self._load(collection, index_dir))
+            # Retrieve the exception if every waiter gave up before the end
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._loading[collection] = task
+
+        if deadline is None:
+            return await asyncio.shield(task)
+
+        timeout = deadline - asyncio.get_running_loop().time()
+        try:
+            # Shielded: a request giving up doesn't cancel the shared load
+            return await asyncio.wait_for(asyncio.shield(task), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out waiting for collection '{collection}' to load")
+            raise Overloaded("index_load", settings.ADMISSION_RETRY_AFTER_SECONDS)
+
+    async def _load(self, collection: str, index_dir: Path) -> FAISSIndexManager:
+        """Load a collection in the threadpool and register it"""
+        try:
+            manager = await run_in_threadpool(self._load_manager, index_dir)
+        finally:
+            self._loading.pop(collection, None)
+
+        self._managers[collection] = manager
+        self._evict()
+        logger.info(f"Collection '{collection}' loaded")
+        return manager
+
+    def _load_manager(self, index_dir: Path) -> FAISSIndexManager:
+        manager = FAISSIndexManager(index_dir, embedding_model=self.load_embedding_model())
+        manager.load()
+        return manager
+
+    def _evict(self):
+        """Evict least recently used collections above the memory ceiling"""
+        # Always keep the most recently used collection, even if it alone
+        # exceeds the ceiling
+        while (
+            len(self._managers) > 1
+            and self._total_bytes(self._managers.values()) > self.max_memory_bytes
+        ):
+            collection, _ = self._managers.popitem(last=False)
+            logger.info(f"Evicted collection '{collection}'")
+
+    @staticmethod
+    def _total_bytes(managers) -> int:
+        return sum(manager.memory_bytes for manager in managers)
+
+    def get_status(self) -> dict:
+        """Get status information about loaded collections"""
+        managers = list(self._managers.items())
+        return {
+            # Kept for monitoring that keys on the single-index status
+            "loaded": any(
+                name == settings.DEFAULT_COLLECTION and manager.is_loaded
+                for name, manager in managers
+            ),
+            "embedding_model_loaded": self.embedding_model is not None,
+            "default_collection": settings.DEFAULT_COLLECTION,
+            "memory_mb": round(
+                self._total_bytes(manager for _, manager in managers) / (1024 * 1024), 2
+            ),
+            "max_memory_mb": settings.FAISS_MAX_MEMORY_MB,
+            "loading": sorted(self._loading),
+            "collections": {name: manager.get_status() for name, manager in managers},
+        }
+
+
 # Global instance
-faiss_manager = FAISSIndexManager()
+index_registry = IndexRegistry()
+
+
+def get_index_registry() -> IndexRegistry:
+    """Dependency injection for index registry"""
+    return index_registry
+
+
+# Global session store
+session_store = create_session_store()
+
+
+def get_session_store():
+    """Dependency injection for session store"""
+    return session_store
+
+
+# Global admission controller
+admission_controller = AdmissionController()
 
 
-def get_faiss_manager() -> FAISSIndexManager:
-    """Dependency injection for FAISS manager"""
-    return faiss_manager
+def get_admission_controller() -> AdmissionController:
+    """Dependency injection for admission controller"""
+    return admission_controller
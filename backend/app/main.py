@@ -7,8 +7,8 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.dependencies import faiss_manager
-from app.api.endpoints import health, ask_stream
+from app.dependencies import index_registry
+from app.api.endpoints import health, ask_stream, sessions
 
 # Configure logging
 logging.basicConfig(
@@ -23,10 +23,11 @@ async def lifespan(app: FastAPI):
     Application lifespan events
     Handles startup and shutdown tasks
     """
-    # Startup: Load FAISS index
+    # Startup: Load shared embedding model and default FAISS index
+    # Other collections are loaded lazily on first request
     logger.info("Starting application...")
     try:
-        faiss_manager.load()
+        await index_registry.get(settings.DEFAULT_COLLECTION)
         logger.info("FAISS index loaded successfully")
     except Exception as e:
         logger.error(f"Failed to load FAISS index: {e}")
@@ -60,6 +61,7 @@ logger.info(f"CORS configured with origins: {settings.allowed_origins_list}")
 # Include routers
 app.include_router(health.router, tags=["Health"])
 app.include_router(ask_stream.router, tags=["Chat"])
+app.include_router(sessions.router, tags=["Chat"])
 
 logger.info("API routers registered")
 
@@ -71,5 +73,8 @@ async def root():
         "message": "BERT LLM Chat API",
         "docs": "/docs",
         "health": "/health",
-        "endpoints": {"ask_stream": "POST /ask-stream"},
+        "endpoints": {
+            "ask_stream": "POST /ask-stream",
+            "delete_session": "DELETE /sessions/{session_id}",
+        },
     }
@@ -0,0 +1,189 @@
+"""
+Conversation session store
+
+Keeps conversation history server-side so clients only send the new question
+"""
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def format_message(message: dict) -> str:
+    """Render a single history message the way it appears in the prompt"""
+    role = message.get("role", "user")
+    content = message.get("content", "")
+    return f"{role.capitalize()}: {content}"
+
+
+def format_history(history: list[dict]) -> str:
+    """Render conversation history as prompt text"""
+    return "\n".join(format_message(msg) for msg in history)
+
+
+class Session:
+    """Conversation history with a cached prompt summary"""
+
+    def __init__(self, messages: Optional[list[dict]] = None, summary: Optional[str] = None):
+        self.messages: list[dict] = messages or []
+        self.summary: str = summary if summary is not None else format_history(self.messages)
+
+    def append(self, messages: list[dict], max_messages: int):
+        """
+        Append messages, trimming the oldest ones beyond max_messages
+
+        Trimming drops whole turns, so the kept history always starts with a
+        user message. The cached summary is extended incrementally and only
+        rebuilt when old messages are dropped.
+        """
+        self.messages.extend(messages)
+
+        if len(self.messages) > max_messages:
+            start = max(len(self.messages) - max_messages, 0)
+            # Don't start the kept history in the middle of a turn
+            while start < len(self.messages) and self.messages[start].get("role") != "user":
+                start += 1
+            self.messages = self.messages[start:]
+            self.summary = format_history(self.messages)
+            return
+
+        new_text = format_history(messages)
+        self.summary = f"{self.summary}\n{new_text}" if self.summary else new_text
+
+    def to_dict(self) -> dict:
+        return {"messages": self.messages, "summary": self.summary}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Session":
+        return cls(messages=data.get("messages", []), summary=data.get("summary"))
+
+
+class InMemorySessionStore:
+    """Process-local session store with LRU eviction"""
+
+    def __init__(self, max_sessions: int, max_messages: int):
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, session_id: str) -> Optional[Session]:
+        """Get a session and mark it as most recently used"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    async def append(self, session_id: str, messages: list[dict]) -> Session:
+        """Append messages to a session, creating it if needed"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session()
+                self._sessions[session_id] = session
+            else:
+                self._sessions.move_to_end(session_id)
+
+            session.append(messages, self.max_messages)
+
+            while len(self._sessions) > self.max_sessions:
+                evicted_id, _ = self._sessions.popitem(last=False)
+                logger.info(f"Evicted session {evicted_id}")
+
+            return session
+
+    async def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def get_status(self) -> dict:
+        return {
+            "backend": "memory",
+            "num_sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+        }
+
+
+class RedisSessionStore:
+    """
+    Redis-backed session store for deployments with several instances
+
+    Sessions expire after SESSION_TTL_SECONDS; LRU eviction is left to
+    Redis' maxmemory-policy.
+    """
+
+    def __init__(self, url: str, max_messages: int, ttl_seconds: int):
+        try:
+            import redis.asyncio as redis
+            from redis.exceptions import WatchError
+        except ImportError as e:
+            raise RuntimeError(
+                "SESSION_BACKEND=redis requires the redis extra (poetry install --extras redis)"
+            ) from e
+
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.max_messages = max_messages
+        self.ttl_seconds = ttl_seconds
+        self._watch_error = WatchError
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"session:{session_id}"
+
+    async def get(self, session_id: str) -> Optional[Session]:
+        data = await self.client.getex(self._key(session_id), ex=self.ttl_seconds)
+        if data is None:
+            return None
+        return Session.from_dict(json.loads(data))
+
+    async def append(self, session_id: str, messages: list[dict]) -> Session:
+        """
+        Append messages to a session, creating it if needed
+
+        Uses WATCH/MULTI so concurrent turns on the same session are retried
+        instead of overwriting each other.
+        """
+        key = self._key(session_id)
+        async with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    data = await pipe.get(key)
+                    session = Session.from_dict(json.loads(data)) if data else Session()
+                    session.append(messages, self.max_messages)
+
+                    pipe.multi()
+                    pipe.set(key, json.dumps(session.to_dict()), ex=self.ttl_seconds)
+                    await pipe.execute()
+                    return session
+                except self._watch_error:
+                    continue
+
+    async def delete(self, session_id: str):
+        await self.client.delete(self._key(session_id))
+
+    def get_status(self) -> dict:
+        return {"backend": "redis", "ttl_seconds": self.ttl_seconds}
+
+
+def create_session_store():
+    """Create the session store configured by SESSION_BACKEND"""
+    if settings.SESSION_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("SESSION_BACKEND=redis requires REDIS_URL")
+        logger.info("Using Redis session store")
+        return RedisSessionStore(
+            settings.REDIS_URL,
+            max_messages=settings.SESSION_MAX_MESSAGES,
+            ttl_seconds=settings.SESSION_TTL_SECONDS,
+        )
+
+    return InMemorySessionStore(
+        max_sessions=settings.SESSION_MAX_SESSIONS,
+        max_messages=settings.SESSION_MAX_MESSAGES,
+    )
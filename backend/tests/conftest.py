@@ -0,0 +1,4 @@
+import os
+
+# Settings requires a Groq key at import time; tests never call the API
+os.environ.setdefault("GROQ_API_KEY", "test")
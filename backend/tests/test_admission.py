@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from app.admission import Overloaded, StageLimiter
+
+
+def deadline_in(seconds: float) -> float:
+    return asyncio.get_running_loop().time() + seconds
+
+
+def test_acquire_and_release():
+    async def scenario():
+        limiter = StageLimiter("test", limit=2, max_queue=0)
+        async with limiter.slot(deadline_in(1)):
+            assert limiter.active == 1
+        assert limiter.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_rejects_when_queue_is_full():
+    async def scenario():
+        limiter = StageLimiter("test", limit=1, max_queue=1)
+        await limiter.acquire(deadline_in(1))
+        waiter = asyncio.create_task(limiter.acquire(deadline_in(1)))
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+
+        with pytest.raises(Overloaded) as exc_info:
+            await limiter.acquire(deadline_in(1))
+        assert exc_info.value.stage == "test"
+        assert limiter.rejected == 1
+
+        limiter.release()
+        await waiter
+        assert limiter.active == 1
+        assert limiter.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_rejects_after_deadline():
+    async def scenario():
+        limiter = StageLimiter("test", limit=1, max_queue=5)
+        await limiter.acquire(deadline_in(1))
+
+        with pytest.raises(Overloaded):
+            await limiter.acquire(deadline_in(0.05))
+        assert limiter.waiting == 0
+        assert limiter.rejected == 1
+
+        # An expired deadline is rejected without queueing
+        with pytest.raises(Overloaded):
+            await limiter.acquire(deadline_in(-1))
+        assert limiter.rejected == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def scenario():
+        limiter = StageLimiter("test", limit=1, max_queue=5)
+        await limiter.acquire(deadline_in(1))
+        waiter = asyncio.create_task(limiter.acquire(deadline_in(1)))
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.waiting == 0
+        assert limiter.active == 1
+
+        limiter.release()
+        await asyncio.wait_for(limiter.acquire(deadline_in(1)), timeout=0.5)
+        assert limiter.active == 1
+
+    asyncio.run(scenario())
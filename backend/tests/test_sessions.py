@@ -0,0 +1,58 @@
+import asyncio
+
+from app.sessions import InMemorySessionStore, Session, format_history
+
+
+def user(content: str) -> dict:
+    return {"role": "user", "content": content}
+
+
+def assistant(content: str) -> dict:
+    return {"role": "assistant", "content": content}
+
+
+def test_append_extends_summary():
+    session = Session()
+    session.append([user("hi"), assistant("hello")], max_messages=10)
+    session.append([user("again"), assistant("sure")], max_messages=10)
+
+    assert len(session.messages) == 4
+    assert session.summary == format_history(session.messages)
+
+
+def test_append_trims_whole_turns():
+    session = Session()
+    session.append([user("1"), assistant("1"), user("2"), assistant("2")], max_messages=3)
+
+    assert session.messages == [user("2"), assistant("2")]
+    assert session.summary == format_history(session.messages)
+
+
+def test_append_never_starts_with_assistant():
+    session = Session()
+    session.append([assistant("0"), user("1"), assistant("1")], max_messages=2)
+
+    assert session.messages == [user("1"), assistant("1")]
+
+
+def test_append_with_zero_limit_keeps_nothing():
+    session = Session()
+    session.append([user("1"), assistant("1")], max_messages=0)
+
+    assert session.messages == []
+    assert session.summary == ""
+
+
+def test_in_memory_store_evicts_least_recently_used():
+    async def scenario():
+        store = InMemorySessionStore(max_sessions=2, max_messages=10)
+        await store.append("a", [user("a")])
+        await store.append("b", [user("b")])
+        await store.get("a")
+        await store.append("c", [user("c")])
+
+        assert await store.get("a") is not None
+        assert await store.get("b") is None
+        assert await store.get("c") is not None
+
+    asyncio.run(scenario())
@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useCallback } from "react";
+import { useState, useCallback, useRef } from "react";
 import { createParser } from "eventsource-parser";
 import type { Message } from "@/components/chat/chat-message";
 
@@ -8,6 +8,15 @@ interface UseChatOptions {
   apiUrl?: string;
 }
 
+function createSessionId(): string {
+  // crypto.randomUUID is only available in secure contexts
+  if (typeof crypto.randomUUID === "function") {
+    return crypto.randomUUID();
+  }
+  const bytes = crypto.getRandomValues(new Uint8Array(16));
+  return Array.from(bytes, (b) => b.toString(16).padStart(2, "0")).join("");
+}
+
 export function useChat(options: UseChatOptions = {}) {
   const {
     apiUrl = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8080",
@@ -16,17 +25,24 @@ export function useChat(options: UseChatOptions = {}) {
   const [messages, setMessages] = useState<Message[]>([]);
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  // History is kept server-side under this session ID (created lazily)
+  const sessionIdRef = useRef<string | null>(null);
 
   const sendMessage = useCallback(
     async (content: string) => {
       if (!content.trim()) return;
 
-      // Build history from existing messages BEFORE adding new message
+      // Local history, only sent to start or restore the server-side session
       const history = messages.map((msg) => ({
         role: msg.role,
         content: msg.content,
       }));
 
+      if (!sessionIdRef.current) {
+        sessionIdRef.current = createSessionId();
+      }
+      const sessionId = sessionIdRef.current;
+
       const userMessage: Message = {
         id: Date.now().toString(),
         role: "user",
@@ -38,16 +54,27 @@ export function useChat(options: UseChatOptions = {}) {
       setError(null);
 
       try {
-        const response = await fetch(`${apiUrl}/ask-stream`, {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify({
-            question: content.trim(),
-            history: history,
-          }),
-        });
+        const postQuestion = (withHistory: boolean) =>
+          fetch(`${apiUrl}/ask-stream`, {
+            method: "POST",
+            headers: {
+              "Content-Type": "application/json",
+            },
+            body: JSON.stringify({
+              question: content.trim(),
+              session_id: sessionId,
+              ...(withHistory ? { history } : {}),
+            }),
+          });
+
+        // A new conversation seeds the session with its (empty) history
+        let response = await postQuestion(history.length === 0);
+
+        // The server lost the session (restart, eviction or another
+        // instance): resend local history once to restore it
+        if (response.status === 409) {
+          response = await postQuestion(true);
+        }
 
         if (!response.ok) {
           throw new Error(`HTTP error! status: ${response.status}`);
@@ -141,9 +168,16 @@ export function useChat(options: UseChatOptions = {}) {
   );
 
   const clearMessages = useCallback(() => {
+    // Drop the server-side history too; failures only delay its expiry
+    if (sessionIdRef.current) {
+      fetch(`${apiUrl}/sessions/${encodeURIComponent(sessionIdRef.current)}`, {
+        method: "DELETE",
+      }).catch((err) => console.error("Failed to delete session:", err));
+    }
+    sessionIdRef.current = null;
     setMessages([]);
     setError(null);
-  }, []);
+  }, [apiUrl]);
 
   return {
     messages,